@@ -0,0 +1,478 @@
+import argparse
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import buddy
+
+
+# Largest page a list request may ask for
+MAX_PAGE_SIZE = 500
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class ConnectionPool:
+    """
+    A fixed set of read-only connections handed out one per request, plus a single writer
+    connection. WAL lets the readers run while a write is in progress; writes take the lock
+    in turn, so they queue in Python instead of failing with "database is locked".
+    Readers attach the archive database once it exists, so archived loans stay readable.
+    """
+    def __init__(self, path, readers=4):
+        self.path = path
+        self.archive = buddy.archive_path(path)
+        self._attached = set()  # ids of the reader connections the archive is attached to
+        self._readers = queue.Queue()
+        for _ in range(readers):
+            conn = self._connect()
+            conn.execute("PRAGMA query_only = ON")
+            self._readers.put(conn)
+        self._writer = self._connect()
+        self._writer.execute("CREATE TEMP TABLE IF NOT EXISTS ImportAccount (line INTEGER NOT NULL, account_id INTEGER NOT NULL)")
+        self._write_lock = threading.Lock()
+
+    def _connect(self):
+        # Transactions are begun explicitly, and a connection is only used by one thread at a time
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+        buddy.apply_connection_settings(conn)
+        return conn
+
+    def _attach_archive(self, conn):
+        # Checked at every checkout, so an archive made while the server runs is picked up
+        if id(conn) in self._attached or not os.path.exists(self.archive):
+            return
+        conn.execute("PRAGMA query_only = OFF")  # attach_archive creates the TEMP views it reads through
+        try:
+            buddy.attach_archive(conn, self.archive)
+        finally:
+            conn.execute("PRAGMA query_only = ON")
+        self._attached.add(id(conn))
+
+    @contextmanager
+    def reader(self):
+        conn = self._readers.get()
+        try:
+            self._attach_archive(conn)
+            conn.execute("BEGIN")  # Every query of a request sees the same snapshot
+            yield conn.cursor()
+        finally:
+            conn.rollback()
+            self._readers.put(conn)
+
+    @contextmanager
+    def writer(self):
+        with self._write_lock:
+            conn = self._writer
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn.cursor()
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.rollback()
+                raise
+            buddy.index_audit_backlog(conn)
+
+    def close(self):
+        with self._write_lock:
+            buddy.index_audit_backlog(self._writer, 1)
+            self._writer.close()
+        while not self._readers.empty():
+            self._readers.get().close()
+
+# Field parsers. Each takes a request value and returns the value to store or raises ValueError.
+
+def required_text(name):
+    def parse(value):
+        value = str(value or '').strip()
+        if not value:
+            raise ValueError(f"{name} is required")
+        return value
+    return parse
+
+def text(value):
+    return str(value or '').strip()
+
+def optional_text(value):
+    return text(value) or None
+
+def number(name, optional=False):
+    def parse(value):
+        if value is None or value == '':
+            if optional:
+                return None
+            raise ValueError(f"{name} is required")
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid {name} '{value}'")
+    return parse
+
+def integer(name, optional=False):
+    def parse(value):
+        if value is None or value == '':
+            if optional:
+                return None
+            raise ValueError(f"{name} is required")
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid {name} '{value}'")
+    return parse
+
+def choice(name, options, normalize=str.upper):
+    def parse(value):
+        value = normalize(str(value or '').strip())
+        if value not in options:
+            raise ValueError(f"Invalid {name} '{value}', expected one of {', '.join(options)}")
+        return value
+    return parse
+
+def checked(name, validate):
+    def parse(value):
+        value = str(value or '').strip()
+        if not validate(value):
+            raise ValueError(f"Invalid {name} '{value}'")
+        return value
+    return parse
+
+def optional_pan(value):
+    value = str(value or '').strip()
+    if value and not buddy.validate_pan(value):
+        raise ValueError(f"Invalid legal_heir_pan '{value}'")
+    return value or None
+
+def ifsc(value):
+    value = str(value or '').strip().upper()
+    if not re.match(r'^[A-Z]{4}0[A-Z0-9]{6}$', value):
+        raise ValueError(f"Invalid IFSC '{value}'")
+    return value
+
+def iso_date(value):
+    try:
+        return buddy.parse_date(str(value or ''))
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+PARTY_FIELDS = {
+    'name': required_text("name"),
+    'mobile': checked("mobile number", buddy.validate_mobile),
+    'email': checked("email address", buddy.validate_email),
+    'address': text,
+    'pan': checked("PAN number", buddy.validate_pan),
+    'aadhaar': checked("Aadhaar number", buddy.validate_aadhaar),
+}
+
+class Resource:
+    """
+    One table exposed at /<name>. fields maps each writable column to its parser and read_only
+    lists columns that are returned but never written; party resources also read and write
+    their linked accounts as an account_ids list.
+    """
+    def __init__(self, table, fields, party=False, read_only=()):
+        self.table = table
+        self.fields = fields
+        self.party = party
+        self.read_only = list(read_only)
+
+    def columns(self):
+        return ["id"] + list(self.fields) + self.read_only
+
+    def columns_sql(self):
+        columns = self.columns()
+        if self.party:
+            columns.append(f"(SELECT json_group_array(account_id) FROM PartyAccount "
+                           f"WHERE party_role = '{self.table}' AND party_id = {self.table}.id)")
+        return ", ".join(columns)
+
+    def to_json(self, row):
+        record = dict(zip(self.columns(), row))
+        if self.party:
+            record['account_ids'] = json.loads(row[-1])
+        return record
+
+    def parse(self, record):
+        for column in self.read_only:
+            if column in record:
+                raise ApiError(400, f"{column} is read-only")
+        values = {}
+        for column, parse in self.fields.items():
+            values[column] = parse(record.get(column))
+        return values
+
+RESOURCES = {
+    'borrowers': Resource('Borrower', dict(PARTY_FIELDS), party=True),
+    'facilitators': Resource('Facilitator', dict(PARTY_FIELDS), party=True),
+    'investors': Resource('Investor', dict(PARTY_FIELDS, legal_heir_name=optional_text, legal_heir_pan=optional_pan),
+                          party=True),
+    'partners': Resource('Partner', dict(PARTY_FIELDS), party=True),
+    'firms': Resource('Firm', {
+        'name': required_text("name"),
+        'mobile': checked("mobile number", buddy.validate_mobile),
+        'email': checked("email address", buddy.validate_email),
+        'address': text,
+        'pan': checked("PAN number", buddy.validate_pan),
+        'registered_date': iso_date,
+        'members': integer("members"),
+        'percent_owned': number("percent_owned"),
+        'firm_state': required_text("firm_state"),
+    }, party=True),
+    'assets': Resource('Asset', {
+        'asset_type': choice("asset_type", buddy.ASSET_TYPES),
+        'asset_mode': choice("asset_mode", buddy.ASSET_MODES),
+        'holder_name': required_text("holder_name"),
+        'deed_id': required_text("deed_id"),
+        'size': number("size"),
+        'units': choice("units", buddy.ASSET_UNITS),
+    }),
+    'accounts': Resource('Account', {
+        'holder_name': required_text("holder_name"),
+        'bank_name': required_text("bank_name"),
+        'ifsc': ifsc,
+        'number': required_text("number"),
+        'branch': required_text("branch"),
+        'account_type': choice("account_type", buddy.ACCOUNT_TYPES),
+    }),
+    'loans': Resource('Loan', {
+        'name': required_text("name"),
+        'recipient': required_text("recipient"),
+        'interest_rate': number("interest_rate"),
+        'interest_frequency': choice("interest_frequency", list(buddy.INTEREST_PERIOD_YEARS), normalize=str),
+        'interest_expected': number("interest_expected", optional=True),
+        'loan_state': choice("loan_state", buddy.LOAN_STATES, normalize=str.capitalize),
+        'asset_id': integer("asset_id", optional=True),
+    }, read_only=buddy.LOAN_BALANCE_COLUMNS),  # Balances are posted as transactions
+    'transactions': Resource('Transactions', {column: None for column in buddy.TRANSACTION_IMPORT_COLUMNS}),
+}
+
+def parse_account_ids(record):
+    account_ids = record.get('account_ids') or []
+    if isinstance(account_ids, str):
+        account_ids = [account_id for account_id in account_ids.split(',') if account_id.strip()]
+    try:
+        return list(dict.fromkeys(int(account_id) for account_id in account_ids))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid account IDs '{record.get('account_ids')}'")
+
+def parse_record(resource, record):
+    if resource.table == 'Transactions':
+        # Same rules as the bulk import
+        return dict(zip(resource.fields, buddy.parse_transaction_row(record, {})))
+    return resource.parse(record)
+
+def fetch_record(cursor, resource, record_id):
+    # Archived rows are found on readers, which attach the archive; the writer only sees hot rows
+    cursor.execute(f"SELECT {resource.columns_sql()} FROM {buddy.history_table(cursor, resource.table)} WHERE id = ?",
+                   (record_id,))
+    row = cursor.fetchone()
+    if row is None:
+        raise ApiError(404, f"No {resource.table} found with ID {record_id}")
+    return resource.to_json(row)
+
+def link_party_accounts(cursor, resource, party_id, account_ids):
+    """
+    Replaces a party's linked accounts, rejecting the request if any account is missing or
+    belongs to another party. Runs inside the write transaction, so a rejection undoes it all.
+    """
+    cursor.execute("DELETE FROM PartyAccount WHERE party_role = ? AND party_id = ?", (resource.table, party_id))
+    problems = buddy.find_account_link_problems(cursor, [(0, account_id) for account_id in account_ids])
+    if problems:
+        raise ApiError(409, problems[0])
+    buddy.link_accounts(cursor, resource.table, party_id, account_ids)
+
+def list_records(pool, resource, query):
+    try:
+        after_id = int(query.get('after_id', 0))
+        limit = min(int(query.get('limit', buddy.PAGE_SIZE)), MAX_PAGE_SIZE)
+        loan_id = int(query['loan_id']) if resource.table == 'Transactions' and 'loan_id' in query else None
+    except ValueError:
+        raise ApiError(400, "after_id, limit and loan_id must be integers")
+
+    where, params = "id > ?", [after_id]
+    if loan_id is not None:
+        where += " AND loan_id = ?"
+        params.append(loan_id)
+    with pool.reader() as cursor:
+        source = buddy.history_table(cursor, resource.table)
+        cursor.execute(f"SELECT {resource.columns_sql()} FROM {source} WHERE {where} ORDER BY id LIMIT ?",
+                       params + [limit])
+        records = [resource.to_json(row) for row in cursor.fetchall()]
+    return 200, {'records': records, 'next_after_id': records[-1]['id'] if len(records) == limit else None}
+
+def get_record(pool, resource, record_id):
+    with pool.reader() as cursor:
+        return 200, fetch_record(cursor, resource, record_id)
+
+def create_record(pool, resource, body):
+    with pool.writer() as cursor:
+        if resource.table == 'Loan':
+            # As in insert_Loan, the recipient is the borrower with the given PAN
+            borrower = buddy.check_pan_exists(cursor, str(body.get('recipient_pan') or '').strip())
+            if borrower is None:
+                raise ApiError(400, "recipient_pan must be the PAN of an existing borrower")
+            body = dict(body, recipient=borrower[0])
+        values = parse_record(resource, body)
+        if resource.table == 'Loan':
+            values['id'], = buddy.allocate_loan_ids(cursor)
+        account_ids = parse_account_ids(body) if resource.party else []
+
+        columns = list(values)
+        cursor.execute(f"INSERT INTO {resource.table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                       [values[column] for column in columns])
+        record_id = cursor.lastrowid
+        if resource.party:
+            link_party_accounts(cursor, resource, record_id, account_ids)
+        return 201, fetch_record(cursor, resource, record_id)
+
+def update_record(pool, resource, record_id, body):
+    with pool.writer() as cursor:
+        current = {column: value for column, value in fetch_record(cursor, resource, record_id).items()
+                   if column not in resource.read_only}
+        values = parse_record(resource, dict(current, **body))  # Unchanged fields are validated again too
+        cursor.execute(f"UPDATE {resource.table} SET {', '.join(f'{column} = ?' for column in values)} WHERE id = ?",
+                       list(values.values()) + [record_id])
+        if resource.party and 'account_ids' in body:
+            link_party_accounts(cursor, resource, record_id, parse_account_ids(body))
+        return 200, fetch_record(cursor, resource, record_id)
+
+def search(pool, query):
+    text = query.get('q', '').strip()
+    if not text or any(len(word) < 3 for word in text.split()):
+        raise ApiError(400, "q needs words of at least 3 characters")
+    with pool.reader() as cursor:
+        total, results = buddy.search_records(cursor, text)
+    return 200, {'total': total, 'results': [dict(zip(['type', 'id', 'title', 'match'], result)) for result in results]}
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """
+    GET /<resource>[?after_id=&limit=&loan_id=], GET /<resource>/<id>, POST /<resource>,
+    PATCH /<resource>/<id> and GET /search?q=. Bodies and responses are JSON.
+    """
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def do_PATCH(self):
+        self.dispatch('PATCH')
+
+    def dispatch(self, method):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        pool = self.server.pool
+        try:
+            if parts == ['search'] and method == 'GET':
+                status, payload = search(pool, query)
+            elif not parts or parts[0] not in RESOURCES or len(parts) > 2:
+                raise ApiError(404, f"Unknown path {url.path}")
+            else:
+                resource = RESOURCES[parts[0]]
+                record_id = None
+                if len(parts) == 2:
+                    if not parts[1].isdigit():
+                        raise ApiError(404, f"Unknown path {url.path}")
+                    record_id = int(parts[1])
+
+                if method == 'GET' and record_id is None:
+                    status, payload = list_records(pool, resource, query)
+                elif method == 'GET':
+                    status, payload = get_record(pool, resource, record_id)
+                elif method == 'POST' and record_id is None:
+                    status, payload = create_record(pool, resource, self.read_body())
+                elif method == 'PATCH' and record_id is not None:
+                    status, payload = update_record(pool, resource, record_id, self.read_body())
+                else:
+                    raise ApiError(405, f"{method} is not allowed on {url.path}")
+        except ApiError as e:
+            status, payload = e.status, {'error': e.message}
+        except ValueError as e:
+            status, payload = 400, {'error': str(e)}
+        except sqlite3.IntegrityError as e:
+            status, payload = 409, {'error': str(e)}
+        except sqlite3.OperationalError as e:
+            status, payload = 503, {'error': str(e)}
+        self.send_json(status, payload)
+
+    def read_body(self):
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+        except ValueError:
+            raise ApiError(400, "Body must be a JSON object")
+        if not isinstance(body, dict):
+            raise ApiError(400, "Body must be a JSON object")
+        return body
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class ApiServer(HTTPServer):
+    """
+    HTTPServer that handles requests on a fixed thread pool instead of a thread per request.
+    """
+    def __init__(self, address, pool, workers=8, verbose=False):
+        super().__init__(address, ApiHandler)
+        self.pool = pool
+        self.verbose = verbose
+        self.executor = ThreadPoolExecutor(workers)
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown()
+
+def serve(host='127.0.0.1', port=8080, readers=4, workers=8, verbose=False):
+    buddy.migrate_database()
+    pool = ConnectionPool(buddy.DB_PATH, readers)
+    server = ApiServer((host, port), pool, workers, verbose)
+    print(f"Serving {buddy.DB_PATH} on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSON API over the loans_investments database.")
+    parser.add_argument("--db", default=buddy.DB_PATH, help="database file to serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--readers", type=int, default=4, help="read-only connections in the pool")
+    parser.add_argument("--workers", type=int, default=8, help="threads handling requests")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    buddy.DB_PATH = args.db
+    serve(args.host, args.port, args.readers, args.workers, args.verbose)
@@ -0,0 +1,667 @@
+import argparse
+import builtins
+import contextlib
+import csv
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+import buddy
+import generate_data
+
+
+# Typical work done by one menu action: an ID lookup, the loan ID allocation
+# done by insert_Loan and a small write that is committed.
+def run_action(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT Id, Holder_Name FROM Account WHERE Id = ?", (1,))
+    cursor.fetchone()
+    buddy.allocate_loan_ids(cursor)
+    cursor.execute('''
+    INSERT INTO Account (Holder_Name, Bank_Name, IFSC, Number, Branch, Account_Type)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', ("Bench Holder", "Bench Bank", "ABCD0123456", "000111222", "Main", "SAVINGS"))
+    conn.commit()
+
+def bench_per_call_connections(actions):
+    """
+    Today's pattern: every action opens its own connection and closes it.
+    """
+    start = time.perf_counter()
+    for _ in range(actions):
+        conn = sqlite3.connect(buddy.DB_PATH, timeout=10)
+        run_action(conn)
+        conn.close()
+    return time.perf_counter() - start
+
+def bench_session_connection(actions):
+    """
+    Session pattern: every action reuses the warm connection from open_session().
+    """
+    start = time.perf_counter()
+    buddy.open_session()
+    try:
+        for _ in range(actions):
+            conn = buddy.create_connection()
+            run_action(conn)
+            conn.close()
+    finally:
+        buddy.close_session()
+    return time.perf_counter() - start
+
+def bench_connections(actions=2000):
+    with tempfile.TemporaryDirectory() as tmp:
+        buddy.DB_PATH = os.path.join(tmp, "bench.db")
+        buddy.migrate_database()
+
+        per_call = bench_per_call_connections(actions)
+        session = bench_session_connection(actions)
+
+    print(f"\nConnection benchmark ({actions} menu actions)")
+    print(f"Open/close per action: {per_call:.3f}s ({per_call / actions * 1e6:.0f} us/action)")
+    print(f"Session connection:    {session:.3f}s ({session / actions * 1e6:.0f} us/action)")
+    print(f"Speed-up: {per_call / session:.1f}x")
+
+def write_transaction_file(path, rows, loans, accounts):
+    rng = random.Random(42)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(buddy.TRANSACTION_IMPORT_COLUMNS)
+        for i in range(rows):
+            transaction_type = rng.choice(buddy.TRANSACTION_TYPES)
+            subtype = rng.choice(buddy.BUSINESS_EXPENSE_SUBTYPES) if transaction_type == 'BUSINESS EXPENSES' else ''
+            writer.writerow([
+                transaction_type, subtype, round(rng.uniform(100, 100000), 2), rng.choice(buddy.TRANSACTION_MODES),
+                f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                rng.randint(1, accounts), rng.randint(1, accounts), 9 * rng.randint(1, loans), "bank", f"statement line {i}"
+            ])
+
+class LockTimingCursor(sqlite3.Cursor):
+    def execute(self, sql, *args):
+        if sql == "BEGIN IMMEDIATE":
+            self.connection.locked_at = time.perf_counter()
+        return super().execute(sql, *args)
+
+class LockTimingConnection(sqlite3.Connection):
+    """
+    Records when a write transaction was started through one of its cursors.
+    """
+    locked_at = None
+
+    def cursor(self, factory=LockTimingCursor):
+        return super().cursor(factory)
+
+def bench_transaction_import(rows=200000, loans=1000, accounts=500):
+    with tempfile.TemporaryDirectory() as tmp:
+        buddy.DB_PATH = os.path.join(tmp, "bench.db")
+        buddy.migrate_database()
+
+        conn = sqlite3.connect(buddy.DB_PATH)
+        conn.executemany('''
+        INSERT INTO Account (Holder_Name, Bank_Name, IFSC, Number, Branch, Account_Type)
+        VALUES ('Bench Holder', 'Bench Bank', 'ABCD0123456', ?, 'Main', 'SAVINGS')
+        ''', [(str(i),) for i in range(accounts)])
+        conn.executemany('''
+        INSERT INTO Loan (id, name, recipient, principal, interest_rate, interest_frequency, loan_state)
+        VALUES (?, 'Bench Loan', 'Bench Borrower', 0, 12, 'Monthly', 'Active')
+        ''', [(9 * i,) for i in range(1, loans + 1)])
+        conn.commit()
+        conn.close()
+
+        path = os.path.join(tmp, "transactions.csv")
+        write_transaction_file(path, rows, loans, accounts)
+
+        conn = sqlite3.connect(buddy.DB_PATH, timeout=10, factory=LockTimingConnection)
+        buddy.apply_connection_settings(conn)
+        try:
+            start = time.perf_counter()
+            imported, rejected = buddy.bulk_import_transactions(conn, path)
+            end = time.perf_counter()
+        finally:
+            conn.close()
+
+    # The write lock is held from BEGIN IMMEDIATE until the import returns
+    elapsed, held = end - start, end - conn.locked_at
+    print(f"\nTransaction import ({rows} rows)")
+    print(f"Imported {imported}, rejected {rejected} in {elapsed:.3f}s ({rows / elapsed:,.0f} rows/s)")
+    print(f"Write lock held for {held:.3f}s ({rows / held:,.0f} rows/s); "
+          f"reading and validating the file took {elapsed - held:.3f}s before it")
+
+def write_party_file(path, rows, accounts):
+    rng = random.Random(7)
+    aadhaars = set()  # Identifiers must be unique, or the rows are rejected rather than imported
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(buddy.PARTY_IMPORT_COLUMNS['Borrower'] + ['account_ids'])
+        for i in range(rows):
+            # Roughly one party in five brings an account; a few of those collide on purpose
+            account_ids = str(rng.randint(1, accounts)) if i % 5 == 0 else ''
+            aadhaar = generate_data.make_aadhaar(rng)
+            while aadhaar in aadhaars:
+                aadhaar = generate_data.make_aadhaar(rng)
+            aadhaars.add(aadhaar)
+            writer.writerow([
+                f"Borrower {i}", f"9{rng.randint(0, 999999999):09d}", f"borrower{i}@example.com", f"{i} Main Road",
+                generate_data.make_pan(i, "Borrower"), aadhaar, account_ids
+            ])
+
+def bench_party_import(rows=100000, accounts=25000):
+    with tempfile.TemporaryDirectory() as tmp:
+        buddy.DB_PATH = os.path.join(tmp, "bench.db")
+        buddy.migrate_database()
+
+        conn = sqlite3.connect(buddy.DB_PATH)
+        conn.executemany('''
+        INSERT INTO Account (Holder_Name, Bank_Name, IFSC, Number, Branch, Account_Type)
+        VALUES ('Bench Holder', 'Bench Bank', 'ABCD0123456', ?, 'Main', 'SAVINGS')
+        ''', [(str(i),) for i in range(accounts)])
+        conn.commit()
+        conn.close()
+
+        path = os.path.join(tmp, "borrowers.csv")
+        write_party_file(path, rows, accounts)
+
+        buddy.open_session()
+        try:
+            start = time.perf_counter()
+            imported, rejected = buddy.bulk_import_parties(buddy.create_connection(), 'Borrower', path)
+            elapsed = time.perf_counter() - start
+        finally:
+            buddy.close_session()
+
+    print(f"\nBorrower import ({rows} rows)")
+    print(f"Imported {imported}, rejected {rejected} in {elapsed:.3f}s ({rows / elapsed:,.0f} rows/s)")
+
+def seed_loan_book(loans, rows):
+    rng = random.Random(9)
+    conn = sqlite3.connect(buddy.DB_PATH)
+    conn.executemany('''
+    INSERT INTO Loan (id, name, recipient, principal, interest_rate, interest_frequency, loan_state)
+    VALUES (?, 'Bench Loan', 'Bench Borrower', 0, ?, ?, 'Active')
+    ''', [(9 * i, rng.choice([9, 12, 18, 24]), rng.choice(list(buddy.INTEREST_PERIOD_YEARS)))
+          for i in range(1, loans + 1)])
+    conn.executemany('''
+    INSERT INTO Transactions (transaction_type, amount, mode, date, from_account, to_account, loan_id)
+    VALUES (?, ?, 'ONLINE', ?, 1, 2, ?)
+    ''', ((rng.choice(buddy.TRANSACTION_TYPES), round(rng.uniform(100, 100000), 2),
+           f"20{rng.randint(20, 24)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", 9 * rng.randint(1, loans))
+          for _ in range(rows)))
+    conn.commit()
+    return conn
+
+def bench_reconcile(rows=2000000, loans=10000):
+    with tempfile.TemporaryDirectory() as tmp:
+        buddy.DB_PATH = os.path.join(tmp, "bench.db")
+        buddy.migrate_database()
+
+        conn = seed_loan_book(loans, rows)
+        # Knock one loan in a hundred out of step with its history
+        conn.execute("UPDATE Loan SET principal = principal + 1 WHERE id % 900 = 0")
+        conn.commit()
+        conn.close()
+
+        buddy.open_session()
+        try:
+            start = time.perf_counter()
+            discrepancies = buddy.reconcile_loans(buddy.create_connection())
+            diff = time.perf_counter() - start
+            start = time.perf_counter()
+            buddy.reconcile_loans(buddy.create_connection(), repair=True)
+            repair = time.perf_counter() - start
+        finally:
+            buddy.close_session()
+
+    print(f"\nLoan reconcile ({rows} transactions, {loans} loans)")
+    print(f"Diff: {len(discrepancies)} discrepancies in {diff:.3f}s")
+    print(f"Diff and repair: {repair:.3f}s")
+
+def bench_accrual(rows=1000000, loans=100000):
+    with tempfile.TemporaryDirectory() as tmp:
+        buddy.DB_PATH = os.path.join(tmp, "bench.db")
+        buddy.migrate_database()
+        seed_loan_book(loans, rows).close()
+
+        buddy.open_session()
+        try:
+            start = time.perf_counter()
+            updated = buddy.accrue_interest(buddy.create_connection(), "2025-01-01")
+            elapsed = time.perf_counter() - start
+        finally:
+            buddy.close_session()
+
+    print(f"\nInterest accrual ({rows} transactions, {loans} loans)")
+    print(f"Accrued {updated} loans in {elapsed:.3f}s")
+
+def bench_payout(transactions=1000000, parties=25000):
+    with tempfile.TemporaryDirectory() as tmp:
+        buddy.DB_PATH = os.path.join(tmp, "bench.db")
+        generate_data.generate_database(buddy.DB_PATH, parties=parties, loans=20000, transactions=transactions)
+        conn = sqlite3.connect(buddy.DB_PATH)
+
+        start = time.perf_counter()
+        payouts = buddy.compute_investor_payouts(conn.cursor(), "2025-06-01", "2025-06-30", 12.0)
+        preview = time.perf_counter() - start
+        start = time.perf_counter()
+        posted = buddy.post_investor_payouts(conn, "2025-06-01", "2025-06-30", 12.0)
+        post = time.perf_counter() - start
+        conn.close()
+
+    print(f"\nInvestor payout ({transactions} transactions, {len(payouts)} investors due)")
+    print(f"Preview: {preview:.3f}s")
+    print(f"Post {len(posted)} payouts: {post:.3f}s")
+
+def bench_dedupe(parties=100000, lookups=2000):
+    with tempfile.TemporaryDirectory() as tmp:
+        buddy.DB_PATH = os.path.join(tmp, "bench.db")
+        generate_data.generate_database(buddy.DB_PATH, parties=parties, loans=1000, transactions=1000)
+        conn = sqlite3.connect(buddy.DB_PATH)
+        cursor = conn.cursor()
+        rng = random.Random(7)
+        identities = cursor.execute("SELECT pan, aadhaar FROM Borrower").fetchall()
+
+        start = time.perf_counter()
+        clusters = buddy.find_duplicate_parties(cursor)
+        scan = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(lookups):
+            buddy.party_identity_owners(cursor, *rng.choice(identities))
+        lookup = time.perf_counter() - start
+        conn.close()
+
+    print(f"\nDuplicate detection ({parties} parties)")
+    print(f"One-pass clustering: {scan:.3f}s, {len(clusters)} clusters")
+    print(f"Cross-table PAN/Aadhaar lookup: {lookup / lookups * 1e6:.0f} us")
+
+def commit_latencies(stop, latencies):
+    """
+    Commits one transaction at a time until stop is set, recording each commit's latency in ms.
+    """
+    conn = sqlite3.connect(buddy.DB_PATH, timeout=10)
+    buddy.apply_connection_settings(conn)
+    while not stop.is_set():
+        start = time.perf_counter()
+        conn.execute('''
+        INSERT INTO Transactions (transaction_type, amount, mode, date, via)
+        VALUES ('BUSINESS EXPENSES', 1, 'CASH', '2025-01-01', 'Bench')
+        ''')
+        conn.commit()
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.001)
+    conn.close()
+
+def latency_row(label, latencies):
+    latencies.sort()
+    return [label, len(latencies), f"{latencies[len(latencies) // 2]:.2f}",
+            f"{latencies[int(len(latencies) * 0.99) - 1]:.2f}", f"{latencies[-1]:.2f}"]
+
+def bench_backup(transactions=2000000):
+    with tempfile.TemporaryDirectory() as tmp:
+        buddy.DB_PATH = os.path.join(tmp, "bench.db")
+        generate_data.generate_database(buddy.DB_PATH, parties=5000, loans=20000, transactions=transactions)
+        buddy.apply_connection_settings(sqlite3.connect(buddy.DB_PATH))  # WAL, as in a menu session
+        size = os.path.getsize(buddy.DB_PATH)
+
+        # Writer commit latency with nothing else running, then while a backup is taken
+        rows = []
+        for label in ["idle", "during backup"]:
+            stop, latencies, steps = threading.Event(), [], []
+            writer = threading.Thread(target=commit_latencies, args=(stop, latencies))
+            writer.start()
+            if label == "idle":
+                time.sleep(2)
+            else:
+                last = [time.perf_counter()]
+
+                def step(remaining, total):
+                    now = time.perf_counter()
+                    steps.append((now - last[0]) * 1000)
+                    last[0] = now + buddy.BACKUP_STEP_PAUSE
+
+                start = time.perf_counter()
+                buddy.backup_database(os.path.join(tmp, "backups"), check='quick_check', progress=step)
+                elapsed = time.perf_counter() - start
+            stop.set()
+            writer.join()
+            rows.append(latency_row(label, latencies))
+
+        # The whole backup with each kind of verification
+        checks = []
+        for check in buddy.BACKUP_CHECKS:
+            start = time.perf_counter()
+            buddy.backup_database(os.path.join(tmp, "backups"), check=check)
+            checks.append([check, f"{time.perf_counter() - start:.2f}"])
+
+    print(f"\nOnline backup ({size / 2**20:.0f} MB, {len(steps)} steps of {buddy.BACKUP_PAGES_PER_STEP} pages)")
+    print(f"Backup with quick_check: {elapsed:.2f}s, slowest step {max(steps):.1f} ms")
+    print(buddy.tabulate(rows, headers=["Writer", "Commits", "p50 (ms)", "p99 (ms)", "Max (ms)"], tablefmt="grid"))
+    print(buddy.tabulate(checks, headers=["Check", "Backup seconds"], tablefmt="grid"))
+
+def set_audit_triggers(cursor, enabled):
+    if enabled:
+        buddy.create_audit_triggers(cursor)
+    else:
+        for table in buddy.AUDIT_TABLES:
+            for action in ['insert', 'update', 'delete']:
+                cursor.execute(f"DROP TRIGGER IF EXISTS trg_audit_{table.lower()}_{action}")
+    cursor.connection.commit()
+
+def bench_audit(transactions=500000, runs=500, rounds=10):
+    with tempfile.TemporaryDirectory() as tmp:
+        buddy.DB_PATH = os.path.join(tmp, "bench.db")
+        generate_data.generate_database(buddy.DB_PATH, parties=2000, loans=10000, transactions=transactions)
+        rng = random.Random(21)
+        buddy.open_session()
+        try:
+            cursor = buddy.create_connection().cursor()
+            max_account = cursor.execute("SELECT max(Id) FROM Account").fetchone()[0]
+            loan_ids = [row[0] for row in cursor.execute("SELECT id FROM Loan")]
+
+            def insert_transaction():
+                run_scripted(buddy.insert_Transaction, [
+                    str(buddy.TRANSACTION_TYPES.index("INTEREST FROM BORROWER") + 1), "1500", "ONLINE", "2025-06-30",
+                    str(rng.randint(1, max_account)), str(rng.randint(1, max_account)), str(rng.choice(loan_ids)),
+                    "NEFT", "benchmark"
+                ])
+
+            # Index the generated history first, so the batch timed below holds only the benchmark's audit rows
+            buddy.index_audit_log(cursor)
+            cursor.connection.commit()
+
+            # Alternate the two setups in short rounds so drift in the machine affects both alike
+            timings = {False: [], True: []}
+            for _ in range(rounds):
+                for enabled in [False, True]:
+                    set_audit_triggers(cursor, enabled)
+                    for _ in range(runs):
+                        start = time.perf_counter()
+                        insert_transaction()
+                        timings[enabled].append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            indexed = buddy.index_audit_backlog(cursor.connection, 1)
+            indexing = time.perf_counter() - start
+        finally:
+            buddy.close_session()
+
+    without, with_audit = statistics.median(timings[False]), statistics.median(timings[True])
+    per_row = indexing / indexed * 1000
+    print(f"\ninsert_Transaction with and without audit triggers ({transactions} transactions, {rounds} x {runs} calls each)")
+    print(buddy.tabulate([["without audit", f"{without:.3f}"], ["with audit", f"{with_audit:.3f}"],
+                          ["with audit and batched indexing", f"{with_audit + per_row:.3f}"]],
+                         headers=["Setup", "Median (ms)"], tablefmt="grid"))
+    print(f"Overhead: {(with_audit / without - 1) * 100:.1f}% in the insert, "
+          f"{((with_audit + per_row) / without - 1) * 100:.1f}% with indexing "
+          f"({indexed} rows indexed in {indexing * 1000:.0f} ms)")
+
+def bench_search(rows=1000000, queries=200):
+    words = ["legal", "fees", "registration", "travel", "brokerage", "plot", "survey", "stamp", "duty",
+             "advocate", "cheque", "transfer", "neft", "rtgs", "interest", "refund", "deposit", "renewal"]
+    places = ["Anna Nagar", "Adyar", "Velachery", "Tambaram", "Madurai", "Coimbatore", "Salem", "Trichy"]
+    with tempfile.TemporaryDirectory() as tmp:
+        buddy.DB_PATH = os.path.join(tmp, "bench.db")
+        buddy.migrate_database()
+
+        rng = random.Random(12)
+        conn = sqlite3.connect(buddy.DB_PATH)
+        start = time.perf_counter()
+        conn.executemany('''
+        INSERT INTO Transactions (transaction_type, amount, mode, date, via, notes)
+        VALUES ('BUSINESS EXPENSES', 100, 'CASH', '2024-01-01', ?, ?)
+        ''', ((f"Agent {rng.randint(1, 5000)}",
+               f"{' '.join(rng.sample(words, 4))} {rng.choice(places)} ref {rng.randint(10**6, 10**7)}")
+              for _ in range(rows)))
+        conn.commit()
+        load = time.perf_counter() - start
+        conn.close()
+
+        terms = [rng.choice(["agent 421", "anna nag", "stamp duty", "velach", "ref 12345", "advoc cheque"])
+                 for _ in range(queries)]
+        buddy.open_session()
+        try:
+            cursor = buddy.create_connection().cursor()
+            start = time.perf_counter()
+            for term in terms:
+                buddy.search_records(cursor, term)
+            elapsed = time.perf_counter() - start
+        finally:
+            buddy.close_session()
+
+    print(f"\nGlobal search ({rows} transactions)")
+    print(f"Loaded and indexed in {load:.3f}s ({rows / load:,.0f} rows/s)")
+    print(f"{queries} searches in {elapsed:.3f}s ({elapsed / queries * 1000:.1f} ms/search)")
+
+def bench_listing(parties=50000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        generate_data.generate_database(path, parties=parties, loans=1, transactions=0)
+        conn = sqlite3.connect(path)
+        query = '''
+        SELECT id, name, mobile, email, address, pan, aadhaar,
+            coalesce((SELECT group_concat(account_id) FROM PartyAccount WHERE party_role = 'Borrower' AND party_id = Borrower.id), 'None')
+        FROM Borrower
+        '''
+        headers = ["Borrower ID", "Name", "Mobile", "Email", "Address", "PAN", "Aadhaar", "Associated Account IDs"]
+
+        def render_tabulate():
+            print(buddy.tabulate(conn.execute(query).fetchall(), headers=headers, tablefmt="grid"))
+
+        def render_streaming():
+            buddy.print_grid(conn.execute(query), headers, buddy.PARTY_GRID_WIDTHS)
+
+        def run(render, trace):
+            first_write = []
+            with open(os.devnull, "w") as devnull:
+                real_write = devnull.write
+                def write(text):
+                    first_write.append(time.perf_counter())
+                    return real_write(text)
+                devnull.write = write
+                if trace:
+                    tracemalloc.start()
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(devnull):
+                    render()
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1] if trace else 0
+                tracemalloc.stop()
+            return elapsed, first_write[0] - start, peak
+
+        # Timed without tracemalloc, which slows allocation-heavy code; memory is measured in a second run
+        results = []
+        for name, render in [("tabulate", render_tabulate), ("print_grid", render_streaming)]:
+            elapsed, first_row, _ = run(render, trace=False)
+            peak = run(render, trace=True)[2]
+            results.append([name, f"{elapsed:.3f}", f"{first_row * 1000:.1f}", f"{peak / 2**20:.1f}"])
+        conn.close()
+
+    rows = int(parties * generate_data.PARTY_MIX[0][1])
+    print(f"\nBorrower listing ({rows} rows)")
+    print(buddy.tabulate(results, headers=["Renderer", "Total (s)", "First row (ms)", "Peak memory (MB)"], tablefmt="grid"))
+
+def bench_export(transactions=500000):
+    with tempfile.TemporaryDirectory() as tmp:
+        buddy.DB_PATH = os.path.join(tmp, "bench.db")
+        generate_data.generate_database(buddy.DB_PATH, parties=1000, loans=5000, transactions=transactions)
+        conn = sqlite3.connect(buddy.DB_PATH)
+
+        results = []
+        for fmt, name in [("csv", "export.csv"), ("jsonl", "export.jsonl"), ("npy", "export_npy")]:
+            path = os.path.join(tmp, name)
+            start = time.perf_counter()
+            count = buddy.export_table(conn, 'Transactions', path)
+            elapsed = time.perf_counter() - start
+            if os.path.isdir(path):
+                size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+            else:
+                size = os.path.getsize(path)
+
+            # Memory is measured in a second, untimed run; tracemalloc slows allocation-heavy code
+            tracemalloc.start()
+            buddy.export_table(conn, 'Transactions', path)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results.append([fmt, f"{elapsed:.2f}", f"{count / elapsed:,.0f}", f"{size / 2**20 / elapsed:.0f}",
+                            f"{peak / 2**20:.1f}"])
+        conn.close()
+
+    print(f"\nTransactions export ({transactions} rows)")
+    print(buddy.tabulate(results, headers=["Format", "Seconds", "Rows/s", "MB/s", "Peak memory (MB)"], tablefmt="grid"))
+
+def run_scripted(action, answers):
+    """
+    Runs an interactive menu action with canned answers to its prompts and its output discarded.
+    """
+    answers = iter(answers)
+    real_input = builtins.input
+    builtins.input = lambda prompt="": next(answers)
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            action()
+    finally:
+        builtins.input = real_input
+
+def time_calls(call, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "runs": runs,
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p50_ms": round(timings[len(timings) // 2], 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+        "max_ms": round(timings[-1], 3),
+    }
+
+def suite_cases(cursor, rng):
+    """
+    The query and write paths behind the menu actions, as (name, callable) pairs.
+    Interactive actions are driven end to end with run_scripted; helpers are called directly.
+    """
+    max_transaction = cursor.execute("SELECT max(id) FROM Transactions").fetchone()[0]
+    max_loan = cursor.execute("SELECT max(id) FROM Loan").fetchone()[0]
+    max_account = cursor.execute("SELECT max(Id) FROM Account").fetchone()[0]
+    pans = [row[0] for row in cursor.execute("SELECT pan FROM Borrower ORDER BY random() LIMIT 1000")]
+
+    def loan_id():
+        return str(9 * rng.randint(1, max_loan // 9))
+
+    def insert_transaction():
+        run_scripted(buddy.insert_Transaction, [
+            str(buddy.TRANSACTION_TYPES.index("INTEREST FROM BORROWER") + 1), "1500", "ONLINE", "2025-06-30",
+            str(rng.randint(1, max_account)), str(rng.randint(1, max_account)), loan_id(), "NEFT", "benchmark"
+        ])
+
+    return [
+        ("check_pan_exists", lambda: buddy.check_pan_exists(cursor, rng.choice(pans))),
+        ("is_account_linked", lambda: buddy.is_account_linked(cursor, rng.randint(1, max_account))),
+        ("allocate_loan_ids", lambda: (buddy.allocate_loan_ids(cursor), cursor.connection.rollback())),
+        ("view_Transaction by id", lambda: run_scripted(buddy.view_Transaction, ["1", str(rng.randint(1, max_transaction))])),
+        ("view_Transaction first page", lambda: run_scripted(buddy.view_Transaction, ["2", "q"])),
+        ("view_Transaction loan date range", lambda: run_scripted(
+            buddy.view_Transaction, ["3", "2020-01-01", "2020-12-31", "2", loan_id(), "q"])),
+        ("view_Transaction account date range", lambda: run_scripted(
+            buddy.view_Transaction, ["3", "2020-01-01", "2020-03-31", "3", str(rng.randint(1, max_account)), "q"])),
+        ("view_Loan by id", lambda: run_scripted(buddy.view_Loan, ["1", loan_id()])),
+        ("view_Loan first page", lambda: run_scripted(buddy.view_Loan, ["2", "q"])),
+        ("insert_Transaction", insert_transaction),
+    ]
+
+def run_suite(db_path, runs):
+    buddy.DB_PATH = db_path
+    buddy.migrate_database()
+    rng = random.Random(13)
+    buddy.open_session()
+    try:
+        cursor = buddy.create_connection().cursor()
+        scale = {table: cursor.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+                 for table in ["Account", "Borrower", "Investor", "Loan", "Transactions"]}
+        results = {name: time_calls(call, runs) for name, call in suite_cases(cursor, rng)}
+    finally:
+        buddy.close_session()
+
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "database": os.path.abspath(db_path),
+        "scale": scale,
+        "results": results,
+    }
+
+def print_suite(report, baseline=None):
+    print(f"\nMenu action suite ({', '.join(f'{n} {t}' for t, n in report['scale'].items())})")
+    for name, stats in report["results"].items():
+        line = f"{name:38} p50 {stats['p50_ms']:9.3f} ms   p95 {stats['p95_ms']:9.3f} ms   max {stats['max_ms']:9.3f} ms"
+        if baseline and name in baseline["results"]:
+            before = baseline["results"][name]["p50_ms"]
+            line += f"   p50 was {before:.3f} ms ({(stats['p50_ms'] - before) / before * 100:+.0f}%)" if before else ""
+        print(line)
+
+def bench_suite(db=None, parties=2000, loans=10000, transactions=500000, runs=200, json_path=None, compare_path=None):
+    """
+    Times the menu action paths against db, or against a freshly generated database of the given
+    scale. The suite writes transactions, so point it at generated databases only.
+    """
+    baseline = None
+    if compare_path:
+        with open(compare_path) as f:
+            baseline = json.load(f)
+
+    if db:
+        report = run_suite(db, runs)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.db")
+            generate_data.generate_database(path, parties, loans, transactions)
+            report = run_suite(path, runs)
+
+    print_suite(report, baseline)
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {json_path}")
+
+BENCHMARKS = {
+    "connections": bench_connections,
+    "import": bench_transaction_import,
+    "party-import": bench_party_import,
+    "reconcile": bench_reconcile,
+    "accrual": bench_accrual,
+    "payout": bench_payout,
+    "dedupe": bench_dedupe,
+    "search": bench_search,
+    "listing": bench_listing,
+    "export": bench_export,
+    "backup": bench_backup,
+    "audit": bench_audit,
+    "suite": bench_suite,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for buddy.py.")
+    parser.add_argument("names", nargs="*", choices=list(BENCHMARKS), help="benchmarks to run (default: all)")
+    parser.add_argument("--db", help="suite: time an existing generated database instead of generating one")
+    parser.add_argument("--parties", type=int, default=2000, help="suite: parties to generate")
+    parser.add_argument("--loans", type=int, default=10000, help="suite: loans to generate")
+    parser.add_argument("--transactions", type=int, default=500000, help="suite: transactions to generate")
+    parser.add_argument("--runs", type=int, default=200, help="suite: timed calls per action")
+    parser.add_argument("--json", dest="json_path", help="suite: write results to this JSON file")
+    parser.add_argument("--compare", dest="compare_path", help="suite: compare with an earlier JSON result")
+    args = parser.parse_args()
+
+    for name in args.names or list(BENCHMARKS):
+        if name == "suite":
+            bench_suite(args.db, args.parties, args.loans, args.transactions, args.runs, args.json_path, args.compare_path)
+        else:
+            BENCHMARKS[name]()
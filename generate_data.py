@@ -0,0 +1,198 @@
+import argparse
+import os
+import random
+import sqlite3
+import string
+from datetime import date, timedelta
+
+import buddy
+
+
+FIRST_NAMES = ["Arun", "Priya", "Karthik", "Divya", "Suresh", "Lakshmi", "Ramesh", "Anitha", "Vijay", "Meena",
+               "Ganesh", "Kavitha", "Senthil", "Revathi", "Prakash", "Deepa", "Murali", "Janani", "Bala", "Sangeetha"]
+LAST_NAMES = ["Kumar", "Raman", "Srinivasan", "Natarajan", "Subramanian", "Iyer", "Pillai", "Reddy", "Nair", "Rao",
+              "Krishnan", "Venkatesh", "Sundaram", "Mohan", "Shankar", "Balaji", "Chandran", "Gopal", "Mani", "Ravi"]
+PLACES = ["Anna Nagar", "Adyar", "Velachery", "Tambaram", "T Nagar", "Mylapore", "Porur", "Madurai", "Coimbatore",
+          "Salem", "Trichy", "Erode", "Vellore", "Tirunelveli", "Thanjavur"]
+BANKS = [("State Bank of India", "SBIN"), ("HDFC Bank", "HDFC"), ("ICICI Bank", "ICIC"), ("Axis Bank", "UTIB"),
+         ("Indian Bank", "IDIB"), ("Canara Bank", "CNRB"), ("Karur Vysya Bank", "KVBL"), ("City Union Bank", "CIUB")]
+VIA = ["NEFT", "RTGS", "IMPS", "UPI", "Cheque", "Cash counter", "Agent"]
+
+# Share of the generated parties that land in each table
+PARTY_MIX = [("Borrower", 0.6), ("Investor", 0.2), ("Facilitator", 0.1), ("Partner", 0.1)]
+
+# Relative frequency of each transaction type in the generated history
+TRANSACTION_MIX = [
+    ("PRINCIPAL TO BORROWER", 15), ("PRINCIPAL FROM BORROWER", 10), ("INTEREST FROM BORROWER", 35),
+    ("INTEREST TO INVESTOR", 25), ("PRINCIPAL FROM INVESTOR", 5), ("PRINCIPAL TO INVESTOR", 5),
+    ("BUSINESS EXPENSES", 5),
+]
+
+# Verhoeff tables used for the Aadhaar check digit
+VERHOEFF_D = [
+    [0, 1, 2, 3, 4, 5, 6, 7, 8, 9], [1, 2, 3, 4, 0, 6, 7, 8, 9, 5], [2, 3, 4, 0, 1, 7, 8, 9, 5, 6],
+    [3, 4, 0, 1, 2, 8, 9, 5, 6, 7], [4, 0, 1, 2, 3, 9, 5, 6, 7, 8], [5, 9, 8, 7, 6, 0, 4, 3, 2, 1],
+    [6, 5, 9, 8, 7, 1, 0, 4, 3, 2], [7, 6, 5, 9, 8, 2, 1, 0, 4, 3], [8, 7, 6, 5, 9, 3, 2, 1, 0, 4],
+    [9, 8, 7, 6, 5, 4, 3, 2, 1, 0],
+]
+VERHOEFF_P = [
+    [0, 1, 2, 3, 4, 5, 6, 7, 8, 9], [1, 5, 7, 6, 2, 8, 3, 0, 9, 4], [5, 8, 0, 3, 7, 9, 6, 1, 4, 2],
+    [8, 9, 1, 6, 0, 4, 3, 5, 2, 7], [9, 4, 5, 3, 1, 2, 6, 8, 7, 0], [4, 2, 8, 6, 5, 7, 3, 9, 0, 1],
+    [2, 7, 9, 3, 8, 0, 6, 4, 1, 5], [7, 0, 4, 6, 9, 1, 3, 2, 5, 8],
+]
+VERHOEFF_INV = [0, 4, 3, 2, 1, 5, 6, 7, 8, 9]
+
+def verhoeff_check_digit(digits):
+    c = 0
+    for i, digit in enumerate(reversed(digits)):
+        c = VERHOEFF_D[c][VERHOEFF_P[(i + 1) % 8][int(digit)]]
+    return str(VERHOEFF_INV[c])
+
+def make_aadhaar(rng):
+    digits = str(rng.randint(2, 9)) + "".join(rng.choice(string.digits) for _ in range(10))
+    return digits + verhoeff_check_digit(digits)
+
+def make_pan(index, surname, holder_type="P"):
+    """
+    PAN unique to index: three letters and four digits come from the index, the fourth
+    letter is the holder type and the fifth the surname initial.
+    """
+    prefix, serial = divmod(index, 10000)
+    letters = ""
+    for _ in range(3):
+        prefix, letter = divmod(prefix, 26)
+        letters = string.ascii_uppercase[letter] + letters
+    return f"{letters}{holder_type}{surname[0].upper()}{serial:04d}{string.ascii_uppercase[index % 26]}"
+
+def make_ifsc(rng, bank_code):
+    return f"{bank_code}0{rng.randint(0, 999999):06d}"
+
+def generate_accounts(rng, count):
+    for _ in range(count):
+        bank_name, bank_code = rng.choice(BANKS)
+        holder = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        yield (holder, bank_name, make_ifsc(rng, bank_code), str(rng.randint(10**11, 10**14 - 1)),
+               rng.choice(PLACES), rng.choice(["SAVINGS", "CURRENT"]))
+
+def generate_database(path, parties=10000, loans=100000, transactions=10000000, seed=42, batch_size=100000):
+    """
+    Builds a fresh database at path with the given number of parties, loans and transactions.
+    The same arguments always produce the same data. Every party owns one account linked through
+    PartyAccount; loans go to borrowers and transactions move money between the accounts of the
+    loan's borrower and a random investor. Returns the row counts written.
+    """
+    if os.path.exists(path):
+        raise FileExistsError(f"{path} already exists")
+
+    rng = random.Random(seed)
+    buddy.DB_PATH = path
+    buddy.migrate_database()
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA synchronous = OFF")
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+
+    # One account per party, linked in PartyAccount
+    party_counts = {table: max(1, int(parties * share)) for table, share in PARTY_MIX}
+    accounts = sum(party_counts.values())
+    cursor.executemany('''
+    INSERT INTO Account (Holder_Name, Bank_Name, IFSC, Number, Branch, Account_Type)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', generate_accounts(rng, accounts))
+
+    party_accounts = {}  # table -> [(party id, account id, name, pan)]
+    next_account = 1
+    pan_index = 0
+    for table, count in party_counts.items():
+        columns = buddy.PARTY_IMPORT_COLUMNS[table]
+        rows, members = [], []
+        for _ in range(count):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            name = f"{first} {last}"
+            pan = make_pan(pan_index, last)
+            pan_index += 1
+            values = [name, f"{rng.randint(6, 9)}{rng.randint(0, 10**9 - 1):09d}",
+                      f"{first.lower()}.{last.lower()}{pan_index}@example.com",
+                      f"{rng.randint(1, 200)}, {rng.choice(PLACES)}", pan, make_aadhaar(rng)]
+            if table == 'Investor':
+                heir_last = rng.choice(LAST_NAMES)
+                values += [f"{rng.choice(FIRST_NAMES)} {heir_last}", make_pan(10**8 + pan_index, heir_last)]
+            rows.append(values)
+            members.append((next_account, name, pan))
+            next_account += 1
+
+        last_indexed_id = buddy.pause_search_sync(cursor, table)
+        cursor.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})", rows
+        )
+        buddy.resume_search_sync(cursor, table, last_indexed_id)
+        cursor.execute(f"SELECT id FROM {table} WHERE id > ? ORDER BY id", (last_indexed_id,))
+        ids = [row[0] for row in cursor.fetchall()]
+        cursor.executemany(
+            "INSERT INTO PartyAccount (party_role, party_id, account_id) VALUES (?, ?, ?)",
+            [(table, party_id, account_id) for party_id, (account_id, _, _) in zip(ids, members)]
+        )
+        party_accounts[table] = [(party_id, account_id, name, pan)
+                                 for party_id, (account_id, name, pan) in zip(ids, members)]
+
+    # Loan IDs come from the sequence in one reserved block; loans are made out to borrowers
+    borrowers, investors = party_accounts['Borrower'], party_accounts['Investor']
+    loan_ids = buddy.allocate_loan_ids(cursor, loans)
+    loan_rows, loan_accounts = [], []
+    for i, loan_id in enumerate(loan_ids, 1):
+        _, account_id, name, _ = rng.choice(borrowers)
+        loan_rows.append((loan_id, f"Loan {i:06d}", name, rng.choice([9, 12, 15, 18, 24]),
+                          rng.choice(list(buddy.INTEREST_PERIOD_YEARS)), rng.choice(["Active", "Active", "Active", "Closed"])))
+        loan_accounts.append(account_id)
+    cursor.executemany('''
+    INSERT INTO Loan (id, name, recipient, principal, interest_rate, interest_frequency, loan_state)
+    VALUES (?, ?, ?, 0, ?, ?, ?)
+    ''', loan_rows)
+
+    # Transactions, in batches so memory stays flat; the loan balance triggers keep Loan in step
+    types, weights = zip(*TRANSACTION_MIX)
+    start_day, days = date(2015, 1, 1), (date(2025, 12, 31) - date(2015, 1, 1)).days
+    dates = [(start_day + timedelta(days=d)).isoformat() for d in range(days + 1)]
+    last_indexed_id = buddy.pause_search_sync(cursor, 'Transactions')
+    written = 0
+    while written < transactions:
+        batch = []
+        for transaction_type in rng.choices(types, weights, k=min(batch_size, transactions - written)):
+            loan = rng.randrange(loans)
+            borrower_account, investor_account = loan_accounts[loan], rng.choice(investors)[1]
+            if transaction_type in ("PRINCIPAL TO BORROWER", "PRINCIPAL FROM INVESTOR", "INTEREST TO INVESTOR"):
+                from_account, to_account = investor_account, borrower_account
+                if transaction_type == "INTEREST TO INVESTOR":
+                    from_account, to_account = borrower_account, investor_account
+            else:
+                from_account, to_account = borrower_account, investor_account
+            subtype = rng.choice(buddy.BUSINESS_EXPENSE_SUBTYPES) if transaction_type == "BUSINESS EXPENSES" else None
+            batch.append((transaction_type, subtype, round(rng.uniform(1000, 500000), 2),
+                          rng.choice(buddy.TRANSACTION_MODES), rng.choice(dates), from_account, to_account,
+                          loan_ids[loan], rng.choice(VIA),
+                          f"{rng.choice(PLACES)} ref {rng.randint(10**6, 10**7 - 1)}" if rng.random() < 0.1 else None))
+        cursor.executemany('''
+        INSERT INTO Transactions (
+            transaction_type, business_expense_subtype, amount, mode, date, from_account, to_account, loan_id, via, notes
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', batch)
+        written += len(batch)
+    buddy.resume_search_sync(cursor, 'Transactions', last_indexed_id)
+
+    conn.commit()
+    conn.execute("PRAGMA optimize")
+    conn.close()
+    return {"parties": accounts, "accounts": accounts, "loans": loans, "transactions": transactions}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a deterministic loans_investments database.")
+    parser.add_argument("--db", default=buddy.DB_PATH, help="database file to create (must not exist)")
+    parser.add_argument("--parties", type=int, default=10000)
+    parser.add_argument("--loans", type=int, default=100000)
+    parser.add_argument("--transactions", type=int, default=10000000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    counts = generate_database(args.db, args.parties, args.loans, args.transactions, args.seed)
+    print(f"Generated {args.db}: " + ", ".join(f"{count} {name}" for name, count in counts.items()))
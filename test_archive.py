@@ -0,0 +1,107 @@
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+import buddy
+
+FIRM_ACCOUNT, BORROWER_ACCOUNT = 1, 2
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    monkeypatch.setattr(buddy, "DB_PATH", str(tmp_path / "archive_test.db"))
+    buddy.migrate_database()
+    conn = sqlite3.connect(buddy.DB_PATH)
+    conn.executemany('''
+    INSERT INTO Account (Holder_Name, Bank_Name, IFSC, Number, Branch, Account_Type)
+    VALUES ('Test Holder', 'Test Bank', 'ABCD0123456', ?, 'Main', 'SAVINGS')
+    ''', [(str(i),) for i in range(2)])
+    conn.executemany('''
+    INSERT INTO Borrower (id, name, mobile, email, address, pan, aadhaar)
+    VALUES (?, ?, '9876543210', 'borrower@example.com', 'Address', ?, ?)
+    ''', [(1, 'Arun Kumar', 'ABCDE1234F', '123412341234'), (2, 'Kumar Arun', 'BCDEF2345G', '234523452345')])
+    conn.execute("INSERT INTO PartyAccount (party_role, party_id, account_id) VALUES ('Borrower', 2, ?)",
+                 (BORROWER_ACCOUNT,))
+    conn.executemany('''
+    INSERT INTO Loan (id, name, recipient, principal, interest_rate, interest_frequency, loan_state)
+    VALUES (?, ?, 'Kumar Arun', 0, 12, 'Monthly', ?)
+    ''', [(9, 'Closed Loan', 'Closed'), (18, 'Active Loan', 'Active')])
+    conn.executemany('''
+    INSERT INTO Transactions (transaction_type, amount, mode, date, from_account, to_account, loan_id, via, notes)
+    VALUES (?, ?, 'ONLINE', ?, ?, ?, ?, 'NEFT', ?)
+    ''', [
+        ('PRINCIPAL TO BORROWER', 10000, '2024-01-10', FIRM_ACCOUNT, BORROWER_ACCOUNT, 9, 'closed loan out'),
+        ('INTEREST FROM BORROWER', 300, '2024-02-10', BORROWER_ACCOUNT, FIRM_ACCOUNT, 9, 'closed loan interest'),
+        ('PRINCIPAL FROM BORROWER', 10000, '2024-03-10', BORROWER_ACCOUNT, FIRM_ACCOUNT, 9, 'closed loan back'),
+        ('PRINCIPAL TO BORROWER', 5000, '2024-02-20', FIRM_ACCOUNT, BORROWER_ACCOUNT, 18, 'active loan out'),
+    ])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def statement(conn, account_id, start='2024-01-01', end='2024-12-31'):
+    cursor = conn.cursor()
+    opening = buddy.account_statement(cursor, account_id, start, end)
+    return opening, cursor.fetchall()
+
+
+def history(conn):
+    cursor = conn.cursor()
+    return {
+        view: cursor.execute(f"SELECT * FROM {buddy.history_table(cursor, table)} ORDER BY id").fetchall()
+        for table, view in buddy.ARCHIVE_VIEWS.items()
+    }
+
+
+def test_reports_read_archived_rows(conn):
+    before = [statement(conn, account_id) for account_id in [FIRM_ACCOUNT, BORROWER_ACCOUNT]]
+    march = statement(conn, BORROWER_ACCOUNT, '2024-03-01', '2024-03-31')
+    found = buddy.search_records(conn.cursor(), "closed loan")[0]
+
+    assert buddy.archive_closed_loans(conn) == {'Transactions': 3, 'Loan': 1, 'Asset': 0}
+    assert conn.execute("SELECT count(*) FROM main.Transactions").fetchone()[0] == 1
+
+    # Every connection the menus open reads through the views once the archive exists
+    reader = buddy.create_connection()
+    try:
+        assert buddy.is_archive_attached(reader.cursor())
+        assert [statement(reader, account_id) for account_id in [FIRM_ACCOUNT, BORROWER_ACCOUNT]] == before
+        assert statement(reader, BORROWER_ACCOUNT, '2024-03-01', '2024-03-31') == march
+        assert buddy.search_records(reader.cursor(), "closed loan")[0] == found
+        assert buddy.reconcile_loans(reader) == []
+    finally:
+        reader.close()
+
+
+def test_merge_repoints_archived_loans(conn):
+    buddy.archive_closed_loans(conn)
+    assert buddy.merge_parties(conn, 'Borrower', 1, [2]) == (2, 1)
+    cursor = conn.cursor()
+    assert cursor.execute("SELECT id, recipient FROM AllLoans ORDER BY id").fetchall() == [
+        (9, 'Arun Kumar'), (18, 'Arun Kumar')
+    ]
+
+
+def test_backup_round_trip_keeps_the_archive(conn, tmp_path):
+    buddy.archive_closed_loans(conn)
+    live = history(conn)
+    assert len(live['AllTransactions']) == 4
+
+    snapshot = buddy.backup_database(str(tmp_path / "backups"), check='quick_check', pause=0)
+    assert os.path.exists(buddy.archive_snapshot_path(snapshot))
+
+    # Restoring is copying a snapshot and its archive snapshot back side by side
+    restored = str(tmp_path / "restored" / "restored.db")
+    os.makedirs(os.path.dirname(restored))
+    shutil.copyfile(snapshot, restored)
+    shutil.copyfile(buddy.archive_snapshot_path(snapshot), buddy.archive_path(restored))
+    restored_conn = sqlite3.connect(restored)
+    try:
+        buddy.attach_archive(restored_conn, buddy.archive_path(restored))
+        assert history(restored_conn) == live
+        assert restored_conn.execute("SELECT count(*) FROM main.Transactions").fetchone()[0] == 1
+    finally:
+        restored_conn.close()
@@ -0,0 +1,119 @@
+import csv
+import sqlite3
+
+import pytest
+
+import buddy
+
+ACCOUNTS = 6
+LOANS = [9, 18, 27]
+
+# Every transaction type, unpadded and month-end dates, a row without a loan and rows with
+# missing references or invalid values that are rejected
+ROWS = [
+    ['PRINCIPAL TO BORROWER', '', '50000', 'online', '2024-01-31', '1', '2', '9', 'NEFT', 'statement line 1'],
+    ['PRINCIPAL FROM BORROWER', '', '1250.5', 'CASH', '2024-2-1', '', '1', '9', 'cash', 'statement line 2'],
+    ['INTEREST FROM BORROWER', '', '999.99', 'ONLINE', '2024-02-29', '3', '1', '18', 'UPI', 'statement line 3'],
+    ['INTEREST TO INVESTOR', '', '400', 'ONLINE', '2024-03-01', '1', '4', '18', 'NEFT', 'statement line 4'],
+    ['BUSINESS EXPENSES', 'Legal', '75.25', 'CASH', '2024-03-15', '5', '', '27', 'advocate', 'statement line 5'],
+    ['PRINCIPAL FROM INVESTOR', '', '20000', 'ONLINE', '2024-03-15', '4', '1', '', 'RTGS', 'statement line 6'],
+    ['PRINCIPAL TO INVESTOR', '', '5000', 'ONLINE', '2024-12-31', '1', '4', '27', 'RTGS', 'statement line 7'],
+    ['INTEREST FROM BORROWER', '', '300', 'ONLINE', '2024-04-01', '2', '1', '999', 'UPI', 'missing loan'],
+    ['INTEREST FROM BORROWER', '', '300', 'ONLINE', '2024-04-01', '99', '1', '9', 'UPI', 'missing account'],
+    ['INTEREST FROM BORROWER', '', '-5', 'ONLINE', '2024-04-01', '2', '1', '9', 'UPI', 'negative amount'],
+    ['INTEREST FROM BORROWER', '', '10', 'ONLINE', '2024-02-30', '2', '1', '9', 'UPI', 'no such day'],
+]
+IMPORTED = 7
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    monkeypatch.setattr(buddy, "DB_PATH", str(tmp_path / "import.db"))
+    buddy.migrate_database()
+    conn = sqlite3.connect(buddy.DB_PATH)
+    conn.executemany('''
+    INSERT INTO Account (Holder_Name, Bank_Name, IFSC, Number, Branch, Account_Type)
+    VALUES ('Test Holder', 'Test Bank', 'ABCD0123456', ?, 'Main', 'SAVINGS')
+    ''', [(str(i),) for i in range(ACCOUNTS)])
+    conn.executemany('''
+    INSERT INTO Loan (id, name, recipient, principal, interest_rate, interest_frequency, loan_state)
+    VALUES (?, 'Test Loan', 'Test Borrower', 0, 12, 'Monthly', 'Active')
+    ''', [(loan_id,) for loan_id in LOANS])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def write_rows(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(buddy.TRANSACTION_IMPORT_COLUMNS)
+        writer.writerows(rows)
+
+
+def insert_one_by_one(conn, rows):
+    # The path every other transaction takes: one INSERT at a time, applied by the triggers
+    for row in rows[:IMPORTED]:
+        values = buddy.parse_transaction_row(dict(zip(buddy.TRANSACTION_IMPORT_COLUMNS, row)), {})
+        conn.execute(f'''
+        INSERT INTO Transactions ({', '.join(buddy.TRANSACTION_IMPORT_COLUMNS)}) VALUES ({', '.join('?' * len(values))})
+        ''', values)
+    conn.commit()
+
+
+def ledger_state(conn):
+    cursor = conn.cursor()
+    buddy.log_audit_inserts(cursor)
+    conn.commit()
+    return {
+        'loans': cursor.execute(
+            f"SELECT id, {', '.join(f'round({column}, 2)' for column in buddy.LOAN_BALANCE_COLUMNS)} FROM Loan ORDER BY id"
+        ).fetchall(),
+        'totals': cursor.execute(
+            "SELECT account_id, month, round(credits, 2), round(debits, 2) FROM AccountMonthlyTotals ORDER BY 1, 2"
+        ).fetchall(),
+        'transactions': cursor.execute(
+            f"SELECT {', '.join(buddy.TRANSACTION_IMPORT_COLUMNS)} FROM Transactions ORDER BY notes"
+        ).fetchall(),
+        'audited': cursor.execute(
+            "SELECT count(*) FROM AuditLog WHERE table_name = 'Transactions' AND action = 'I'"
+        ).fetchone()[0],
+        'found': [buddy.search_records(cursor, text)[0] for text in ['statement line', 'line 3', 'advocate', 'rtgs']],
+        'schema': cursor.execute("SELECT type, name, sql FROM sqlite_master ORDER BY name").fetchall(),
+    }
+
+
+@pytest.mark.parametrize("rebuild_share", [0, float('inf')], ids=["rebuilt indexes", "sorted insert"])
+def test_bulk_import_matches_the_trigger_path(conn, tmp_path, monkeypatch, rebuild_share):
+    monkeypatch.setattr(buddy, "INDEX_REBUILD_SHARE", rebuild_share)
+    path = str(tmp_path / "transactions.csv")
+    write_rows(path, ROWS)
+    expected_conn = sqlite3.connect(tmp_path / "expected.db")
+    conn.backup(expected_conn)
+
+    assert buddy.bulk_import_transactions(conn, path) == (IMPORTED, len(ROWS) - IMPORTED)
+    with open(path + '.errors.csv', newline='') as f:
+        errors = list(csv.DictReader(f))
+    assert sorted(int(error['line']) for error in errors) == list(range(IMPORTED + 2, len(ROWS) + 2))
+    assert "Loan ID 999 does not exist" in [error['error'] for error in errors]
+    imported = ledger_state(conn)
+
+    insert_one_by_one(expected_conn, ROWS)
+    expected = ledger_state(expected_conn)
+    expected_conn.close()
+
+    assert imported == expected
+    assert imported['audited'] == IMPORTED
+    assert buddy.reconcile_loans(conn) == []
+
+
+def test_bulk_import_keeps_existing_search_and_balances(conn, tmp_path):
+    insert_one_by_one(conn, ROWS)
+    path = str(tmp_path / "transactions.csv")
+    write_rows(path, ROWS[:IMPORTED])
+
+    assert buddy.bulk_import_transactions(conn, path) == (IMPORTED, 0)
+    cursor = conn.cursor()
+    assert buddy.search_records(cursor, "statement line")[0] == 2 * IMPORTED
+    assert buddy.reconcile_loans(conn) == []
+    assert cursor.execute("SELECT count(*) FROM temp.sqlite_master WHERE name = 'TransactionImport'").fetchone()[0] == 0
@@ -0,0 +1,79 @@
+import sqlite3
+
+import pytest
+
+import buddy
+
+FIRM_ACCOUNT = 1
+START, END, RATE = '2024-04-01', '2024-06-30', 12
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    monkeypatch.setattr(buddy, "DB_PATH", str(tmp_path / "payouts.db"))
+    buddy.migrate_database()
+    conn = sqlite3.connect(buddy.DB_PATH)
+    conn.executemany('''
+    INSERT INTO Account (Holder_Name, Bank_Name, IFSC, Number, Branch, Account_Type)
+    VALUES ('Test Holder', 'Test Bank', 'ABCD0123456', ?, 'Main', 'SAVINGS')
+    ''', [(str(i),) for i in range(3)])
+    conn.executemany('''
+    INSERT INTO Investor (id, name, mobile, email, address, pan, aadhaar)
+    VALUES (?, ?, '9876543210', 'investor@example.com', 'Address', ?, ?)
+    ''', [(1, 'Loan Investor', 'ABCDE1234F', '123412341234'), (2, 'Pool Investor', 'BCDEF2345G', '234523452345')])
+    conn.executemany("INSERT INTO PartyAccount (party_role, party_id, account_id) VALUES ('Investor', ?, ?)",
+                     [(1, 2), (2, 3)])
+    conn.execute('''
+    INSERT INTO Loan (id, name, recipient, principal, interest_rate, interest_frequency, loan_state)
+    VALUES (5, 'Closed Loan', 'Test Borrower', 0, 12, 'Monthly', 'Closed')
+    ''')
+    # The first investor's capital came in and partly went back against the loan that is archived
+    conn.executemany('''
+    INSERT INTO Transactions (transaction_type, amount, mode, date, from_account, to_account, loan_id, via, notes)
+    VALUES (?, ?, 'ONLINE', ?, ?, ?, ?, 'NEFT', '')
+    ''', [
+        ('PRINCIPAL FROM INVESTOR', 100000, '2024-01-01', 2, FIRM_ACCOUNT, 5),
+        ('PRINCIPAL TO INVESTOR', 40000, '2024-05-01', FIRM_ACCOUNT, 2, 5),
+        ('PRINCIPAL FROM INVESTOR', 50000, '2024-02-01', 3, FIRM_ACCOUNT, None),
+    ])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def test_payouts_are_unchanged_by_archiving(conn, tmp_path):
+    before = buddy.compute_investor_payouts(conn.cursor(), START, END, RATE)
+    assert [payout[0] for payout in before] == [1, 2]
+
+    moved = buddy.archive_closed_loans(conn)
+    assert moved['Transactions'] == 2
+    assert buddy.compute_investor_payouts(conn.cursor(), START, END, RATE) == before
+
+    # A new connection finds the archive next to the database by itself
+    fresh = sqlite3.connect(buddy.DB_PATH)
+    try:
+        assert buddy.post_investor_payouts(fresh, START, END, RATE, FIRM_ACCOUNT) == before
+    finally:
+        fresh.close()
+
+
+def test_payouts_are_posted_once_per_period(conn):
+    posted = buddy.post_investor_payouts(conn, START, END, RATE, FIRM_ACCOUNT)
+    assert len(posted) == 2
+    assert buddy.post_investor_payouts(conn, START, END, RATE, FIRM_ACCOUNT) == []
+    assert buddy.compute_investor_payouts(conn.cursor(), START, END, RATE) == []
+
+    cursor = conn.cursor()
+    cursor.execute('''
+    SELECT InvestorPayout.investor_id, Transactions.amount, Transactions.to_account
+    FROM InvestorPayout JOIN Transactions ON Transactions.id = InvestorPayout.transaction_id
+    ORDER BY InvestorPayout.investor_id
+    ''')
+    assert cursor.fetchall() == [(payout[0], payout[6], payout[2]) for payout in posted]
+    with pytest.raises(sqlite3.IntegrityError):
+        cursor.execute("INSERT INTO InvestorPayout (investor_id, period_start, period_end, transaction_id) "
+                       "VALUES (1, ?, ?, 1)", (START, END))
+    conn.rollback()
+
+    # Another period is paid on its own
+    assert len(buddy.post_investor_payouts(conn, '2024-07-01', '2024-09-30', RATE, FIRM_ACCOUNT)) == 2
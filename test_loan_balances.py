@@ -0,0 +1,92 @@
+import csv
+import sqlite3
+
+import pytest
+
+import buddy
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    monkeypatch.setattr(buddy, "DB_PATH", str(tmp_path / "balances.db"))
+    buddy.migrate_database()
+    conn = sqlite3.connect(buddy.DB_PATH)
+    conn.executemany('''
+    INSERT INTO Account (Holder_Name, Bank_Name, IFSC, Number, Branch, Account_Type)
+    VALUES ('Test Holder', 'Test Bank', 'ABCD0123456', ?, 'Main', 'SAVINGS')
+    ''', [(str(i),) for i in range(2)])
+    conn.executemany('''
+    INSERT INTO Loan (id, name, recipient, principal, interest_rate, interest_frequency, loan_state)
+    VALUES (?, 'Test Loan', 'Test Borrower', 0, 12, 'Monthly', 'Active')
+    ''', [(9,), (18,)])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def insert(conn, transaction_type, amount, loan_id):
+    cursor = conn.execute('''
+    INSERT INTO Transactions (transaction_type, amount, mode, date, from_account, to_account, loan_id, via, notes)
+    VALUES (?, ?, 'ONLINE', '2024-01-15', 1, 2, ?, 'NEFT', '')
+    ''', (transaction_type, amount, loan_id))
+    conn.commit()
+    return cursor.lastrowid
+
+
+def balances(conn, loan_id):
+    columns = ", ".join(f"round(coalesce({column}, 0), 2)" for column in buddy.LOAN_BALANCE_COLUMNS)
+    return dict(zip(buddy.LOAN_BALANCE_COLUMNS, conn.execute(f"SELECT {columns} FROM Loan WHERE id = ?", (loan_id,)).fetchone()))
+
+
+def test_balances_follow_inserts_updates_and_deletes(conn):
+    lent = insert(conn, 'PRINCIPAL TO BORROWER', 10000, 9)
+    repaid = insert(conn, 'PRINCIPAL FROM BORROWER', 2500, 9)
+    interest = insert(conn, 'INTEREST FROM BORROWER', 300, 9)
+    insert(conn, 'BUSINESS EXPENSES', 50, 18)
+    assert balances(conn, 9)['principal'] == 7500
+    assert balances(conn, 9)['interest_realized'] == 300
+    assert buddy.reconcile_loans(conn) == []
+
+    conn.execute("UPDATE Transactions SET amount = 12000 WHERE id = ?", (lent,))
+    conn.execute("UPDATE Transactions SET loan_id = 18 WHERE id = ?", (interest,))
+    conn.execute("UPDATE Transactions SET transaction_type = 'BUSINESS EXPENSES' WHERE id = ?", (repaid,))
+    conn.commit()
+    loan = balances(conn, 9)
+    assert (loan['principal'], loan['expenses'], loan['interest_realized']) == (12000, 2500, 0)
+    assert balances(conn, 18)['interest_realized'] == 300
+    assert buddy.reconcile_loans(conn) == []
+
+    conn.execute("DELETE FROM Transactions WHERE id IN (?, ?)", (lent, interest))
+    conn.commit()
+    assert balances(conn, 9)['principal'] == 0
+    assert balances(conn, 18)['interest_realized'] == 0
+    assert buddy.reconcile_loans(conn) == []
+
+
+def test_balances_follow_a_bulk_import(conn, tmp_path):
+    insert(conn, 'PRINCIPAL TO BORROWER', 1000, 9)
+    path = str(tmp_path / "transactions.csv")
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(buddy.TRANSACTION_IMPORT_COLUMNS)
+        writer.writerows([
+            ['PRINCIPAL TO BORROWER', '', '4000', 'ONLINE', '2024-02-01', '1', '2', '9', 'NEFT', ''],
+            ['INTEREST FROM BORROWER', '', '120', 'ONLINE', '2024-03-01', '2', '1', '18', 'UPI', ''],
+        ])
+
+    assert buddy.bulk_import_transactions(conn, path) == (2, 0)
+    assert balances(conn, 9)['principal'] == 5000
+    assert balances(conn, 18)['interest_realized'] == 120
+    assert buddy.reconcile_loans(conn) == []
+
+
+def test_reconcile_repairs_drifted_balances(conn):
+    insert(conn, 'PRINCIPAL TO BORROWER', 1000, 9)
+    conn.execute("UPDATE Loan SET principal = 400 WHERE id = 9")
+    conn.commit()
+
+    drifted = buddy.reconcile_loans(conn)
+    assert [loan_id for loan_id, _, _ in drifted] == [9]
+    buddy.reconcile_loans(conn, repair=True)
+    assert balances(conn, 9)['principal'] == 1000
+    assert buddy.reconcile_loans(conn) == []
@@ -0,0 +1,60 @@
+import sqlite3
+
+import pytest
+
+import buddy
+
+
+@pytest.fixture
+def path(tmp_path, monkeypatch):
+    monkeypatch.setattr(buddy, "DB_PATH", str(tmp_path / "loan_ids.db"))
+    buddy.migrate_database()
+    return buddy.DB_PATH
+
+
+def test_ids_are_handed_out_in_steps(path):
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    first = buddy.allocate_loan_ids(cursor)
+    batch = buddy.allocate_loan_ids(cursor, 3)
+    conn.commit()
+    conn.close()
+
+    step = buddy.LOAN_ID_STEP
+    assert first == [step]
+    assert batch == [2 * step, 3 * step, 4 * step]
+
+
+def test_ids_are_only_used_up_when_committed(path):
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    reserved = buddy.allocate_loan_ids(cursor, 2)
+    conn.rollback()
+    assert buddy.allocate_loan_ids(cursor, 2) == reserved
+    conn.close()
+
+
+def test_connections_never_share_an_id(path):
+    first, second = sqlite3.connect(path, timeout=0), sqlite3.connect(path, timeout=0)
+    ids = buddy.allocate_loan_ids(first.cursor(), 2)
+    # The allocation holds the write lock until the first connection commits
+    with pytest.raises(sqlite3.OperationalError):
+        buddy.allocate_loan_ids(second.cursor())
+    first.commit()
+    ids += buddy.allocate_loan_ids(second.cursor())
+    second.commit()
+    first.close()
+    second.close()
+
+    assert len(set(ids)) == 3
+
+
+def test_explicit_ids_move_the_sequence_forward(path):
+    conn = sqlite3.connect(path)
+    conn.execute('''
+    INSERT INTO Loan (id, name, recipient, principal, interest_rate, interest_frequency, loan_state)
+    VALUES (100, 'Imported Loan', 'Test Borrower', 0, 12, 'Monthly', 'Active')
+    ''')
+    assert buddy.allocate_loan_ids(conn.cursor()) == [100 + buddy.LOAN_ID_STEP]
+    conn.commit()
+    conn.close()
@@ -0,0 +1,134 @@
+import csv
+import sqlite3
+
+import pytest
+
+import buddy
+
+PARTY = ['9876543210', 'party@example.com', 'Address']
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    monkeypatch.setattr(buddy, "DB_PATH", str(tmp_path / "parties.db"))
+    buddy.migrate_database()
+    conn = sqlite3.connect(buddy.DB_PATH)
+    conn.executemany('''
+    INSERT INTO Account (Holder_Name, Bank_Name, IFSC, Number, Branch, Account_Type)
+    VALUES ('Test Holder', 'Test Bank', 'ABCD0123456', ?, 'Main', 'SAVINGS')
+    ''', [(str(i),) for i in range(6)])
+    conn.execute('''
+    INSERT INTO Borrower (id, name, mobile, email, address, pan, aadhaar)
+    VALUES (1, 'Dr. Arun Kumar', ?, ?, ?, 'AAAAA1111A', '111111111111')
+    ''', PARTY)
+    conn.execute("INSERT INTO PartyAccount (party_role, party_id, account_id) VALUES ('Borrower', 1, 1)")
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def import_rows(conn, tmp_path, rows, batch_size=10000):
+    path = str(tmp_path / "borrowers.csv")
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(buddy.PARTY_IMPORT_COLUMNS['Borrower'] + ['account_ids'])
+        writer.writerows(rows)
+    counts = buddy.bulk_import_parties(conn, 'Borrower', path, batch_size)
+    try:
+        with open(path + '.errors.csv', newline='') as f:
+            errors = {int(error['line']): error['error'] for error in csv.DictReader(f)}
+    except FileNotFoundError:
+        errors = {}
+    return counts, errors
+
+
+# Data lines start at line 2, after the header
+IMPORT_ROWS = [
+    ['New Borrower', *PARTY, 'BBBBB2222B', '222222222222', '2'],
+    ['Same PAN As Existing', *PARTY, 'AAAAA1111A', '333333333333', ''],
+    ['Same PAN As Line 2', *PARTY, 'BBBBB2222B', '444444444444', ''],
+    ['Same Aadhaar As Line 2', *PARTY, 'CCCCC3333C', '222222222222', ''],
+    ['Linked Account', *PARTY, 'DDDDD4444D', '555555555555', '1'],
+    ['Account Of Line 2', *PARTY, 'EEEEE5555E', '666666666666', '2'],
+    ['Missing Account', *PARTY, 'FFFFF6666F', '777777777777', '99'],
+    ['Bad PAN', *PARTY, 'not-a-pan', '888888888888', ''],
+    ['Two Accounts', *PARTY, 'GGGGG7777G', '999999999999', '3, 4'],
+]
+REJECTED_LINES = [3, 4, 5, 6, 7, 8, 9]
+
+
+def test_party_import_rejects_duplicate_identities_and_accounts(conn, tmp_path):
+    (imported, rejected), errors = import_rows(conn, tmp_path, IMPORT_ROWS)
+
+    assert (imported, rejected) == (2, len(REJECTED_LINES))
+    assert errors == {
+        3: "PAN AAAAA1111A already belongs to another borrower",
+        4: "PAN BBBBB2222B already belongs to another borrower",
+        5: "Aadhaar 222222222222 already belongs to another borrower",
+        6: "Account ID 1 is already linked to another entity",
+        7: "Account ID 2 is requested by an earlier row",
+        8: "No account found with ID 99",
+        9: "Invalid PAN number 'not-a-pan'",
+    }
+    cursor = conn.cursor()
+    cursor.execute('''
+    SELECT Borrower.name, PartyAccount.account_id
+    FROM Borrower LEFT JOIN PartyAccount ON PartyAccount.party_role = 'Borrower' AND PartyAccount.party_id = Borrower.id
+    ORDER BY Borrower.id, PartyAccount.account_id
+    ''')
+    assert cursor.fetchall() == [
+        ('Dr. Arun Kumar', 1), ('New Borrower', 2), ('Two Accounts', 3), ('Two Accounts', 4)
+    ]
+    assert buddy.search_records(cursor, "Two Accounts")[0] == 1
+
+
+def test_party_import_rejects_duplicates_across_batches(conn, tmp_path):
+    (imported, rejected), errors = import_rows(conn, tmp_path, IMPORT_ROWS, batch_size=2)
+    assert (imported, rejected) == (2, len(REJECTED_LINES))
+    assert sorted(errors) == REJECTED_LINES
+
+
+def test_duplicates_are_found_and_merged(conn, tmp_path):
+    import_rows(conn, tmp_path, [
+        ['kumar arun', *PARTY, 'BBBBB2222B', '222222222222', '2'],
+        ['Someone Else', '9123456789', 'else@example.com', 'Address', 'CCCCC3333C', '333333333333', ''],
+    ])
+    conn.executemany('''
+    INSERT INTO Loan (id, name, recipient, principal, interest_rate, interest_frequency, loan_state)
+    VALUES (?, 'Test Loan', ?, 0, 12, 'Monthly', 'Active')
+    ''', [(9, 'Dr. Arun Kumar'), (18, 'kumar arun')])
+    conn.commit()
+    cursor = conn.cursor()
+
+    clusters = buddy.find_duplicate_parties(cursor)
+    assert [([member[:2] for member in members], matched) for members, matched in clusters] == [
+        ([('Borrower', 1), ('Borrower', 2)], 'mobile and name')
+    ]
+
+    assert buddy.merge_parties(conn, 'Borrower', 1, [2]) == (1, 1)
+    assert cursor.execute("SELECT id FROM Borrower ORDER BY id").fetchall() == [(1,), (3,)]
+    assert cursor.execute("SELECT recipient FROM Loan ORDER BY id").fetchall() == [('Dr. Arun Kumar',)] * 2
+    assert cursor.execute(
+        "SELECT account_id FROM PartyAccount WHERE party_role = 'Borrower' AND party_id = 1 ORDER BY account_id"
+    ).fetchall() == [(1,), (2,)]
+    assert buddy.find_duplicate_parties(cursor) == []
+
+
+def test_merging_investors_keeps_one_payout_per_period(conn):
+    conn.executemany('''
+    INSERT INTO Investor (id, name, mobile, email, address, pan, aadhaar)
+    VALUES (?, 'Investor', ?, ?, ?, ?, ?)
+    ''', [(1, *PARTY, 'HHHHH8888H', '121212121212'), (2, *PARTY, 'IIIII9999I', '131313131313')])
+    conn.execute('''
+    INSERT INTO Transactions (transaction_type, amount, mode, date, from_account, to_account, loan_id, via, notes)
+    VALUES ('INTEREST TO INVESTOR', 100, 'ONLINE', '2024-03-31', 1, 2, NULL, 'Payout', '')
+    ''')
+    conn.executemany('''
+    INSERT INTO InvestorPayout (investor_id, period_start, period_end, transaction_id) VALUES (?, ?, ?, 1)
+    ''', [(1, '2024-01-01', '2024-03-31'), (2, '2024-01-01', '2024-03-31'), (2, '2024-04-01', '2024-06-30')])
+    conn.commit()
+
+    buddy.merge_parties(conn, 'Investor', 1, [2])
+    assert conn.execute("SELECT investor_id, period_start FROM InvestorPayout ORDER BY period_start").fetchall() == [
+        (1, '2024-01-01'), (1, '2024-04-01')
+    ]
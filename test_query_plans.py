@@ -0,0 +1,30 @@
+import sqlite3
+
+import pytest
+
+import buddy
+
+
+@pytest.fixture(scope="module")
+def cursor(tmp_path_factory):
+    path = tmp_path_factory.mktemp("plans") / "plans.db"
+    original_path = buddy.DB_PATH
+    buddy.DB_PATH = str(path)
+    try:
+        buddy.migrate_database()
+    finally:
+        buddy.DB_PATH = original_path
+    conn = sqlite3.connect(path)
+    yield conn.cursor()
+    conn.close()
+
+
+@pytest.mark.parametrize(
+    "description, query, params", buddy.HOT_PATH_QUERIES, ids=[query[0] for query in buddy.HOT_PATH_QUERIES]
+)
+def test_hot_path_query_uses_an_index(cursor, description, query, params):
+    cursor.execute("EXPLAIN QUERY PLAN " + query, params)
+    plan = [row[3] for row in cursor.fetchall()]
+    # Full-text lookups show up as a SCAN of the virtual table driven by its own index
+    scans = [step for step in plan if step.startswith("SCAN") and "VIRTUAL TABLE INDEX" not in step]
+    assert not scans, f"{description} is not using an index: {plan}"